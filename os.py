@@ -1,10 +1,23 @@
 import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import PatchCollection
+from matplotlib.colors import ListedColormap, to_rgba_array
 import seaborn as sns
 import random
 import pandas as pd
-from collections import deque
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from functools import lru_cache
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is optional; the pure-Python simulator is used instead
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 # ---------------------------
 # Custom CSS for Enhanced Styling
@@ -57,127 +70,255 @@ sim_type = st.sidebar.selectbox("Choose Simulation",
 # ===========================
 # Page Replacement Simulation
 # ===========================
+HEATMAP_ANNOTATE_LIMIT = 40  # Longest history drawn with per-cell labels
+def build_next_use_table(page_refs):
+    # next_use[i] is the next step at which page_refs[i] is referenced again,
+    # or len(page_refs) if it never is. A stable sort groups each page's steps
+    # in order, so every step's successor within its group is its next use.
+    order = np.argsort(page_refs, kind='stable')
+    next_use = np.full(len(page_refs), len(page_refs), dtype=np.int32)
+    same_page = page_refs[order[1:]] == page_refs[order[:-1]]
+    next_use[order[:-1][same_page]] = order[1:][same_page]
+    return next_use
+
+@njit(cache=True)
+def _simulate_lru_numba(page_refs, num_frames):
+    n = page_refs.shape[0]
+    frames = np.full(num_frames, -1, np.int32)
+    last_used = np.zeros(num_frames, np.int64)  # Step (+1) each frame was last touched
+    history = np.empty((n, num_frames), np.int32)
+    fault_markers = np.zeros(n, np.bool_)
+    filled = 0
+    for i in range(n):
+        page = page_refs[i]
+        slot = -1
+        for j in range(filled):
+            if frames[j] == page:
+                slot = j
+                break
+        if slot == -1:
+            fault_markers[i] = True
+            if filled < num_frames:
+                slot = filled
+                filled += 1
+            else:
+                # Replace the least recently used page
+                slot = np.argmin(last_used)
+            frames[slot] = page
+        last_used[slot] = i + 1
+        history[i] = frames
+    return history, fault_markers
+
+@njit(cache=True)
+def _simulate_optimal_numba(page_refs, num_frames, next_use):
+    n = page_refs.shape[0]
+    frames = np.full(num_frames, -1, np.int32)
+    frame_next = np.zeros(num_frames, np.int32)  # Next use of the page held by each frame
+    history = np.empty((n, num_frames), np.int32)
+    fault_markers = np.zeros(n, np.bool_)
+    filled = 0
+    for i in range(n):
+        page = page_refs[i]
+        slot = -1
+        for j in range(filled):
+            if frames[j] == page:
+                slot = j
+                break
+        if slot == -1:
+            fault_markers[i] = True
+            if filled < num_frames:
+                slot = filled
+                filled += 1
+            else:
+                # Replace the page that is used farthest in the future
+                slot = np.argmax(frame_next)
+            frames[slot] = page
+        frame_next[slot] = next_use[i]
+        history[i] = frames
+    return history, fault_markers
+
+@st.cache_data(show_spinner=False)
 def simulate_page_replacement(page_refs, num_frames, algorithm="LRU"):
-    frames = [-1] * num_frames
-    page_faults = 0
-    frame_history = []  # Snapshot of frames at each step
-    fault_markers = []  # Marks if a page fault occurred at that step
-    recency = deque()   # For LRU tracking
-
-    for i, page in enumerate(page_refs):
-        fault = False
-        if page in frames:
+    page_refs = np.asarray(page_refs, dtype=np.int32)
+    if NUMBA_AVAILABLE:
+        if algorithm == "LRU":
+            history, fault_markers = _simulate_lru_numba(page_refs, num_frames)
+        else:
+            history, fault_markers = _simulate_optimal_numba(page_refs, num_frames, build_next_use_table(page_refs))
+        return int(fault_markers.sum()), history, fault_markers
+
+    frames = np.full(num_frames, -1, dtype=np.int32)
+    history = np.empty((len(page_refs), num_frames), dtype=np.int32)  # Snapshot of frames at each step
+    fault_markers = np.zeros(len(page_refs), dtype=bool)  # Marks if a page fault occurred at that step
+    recency = OrderedDict()  # For LRU tracking, least recent first
+    page_to_slot = {}   # Resident page -> frame slot, for O(1) membership checks
+    free_slots = deque(range(num_frames))
+
+    # For Optimal: next-use table plus the step each resident page was last referenced
+    next_use = build_next_use_table(page_refs) if algorithm == "Optimal" else None
+    last_ref = {}
+
+    # Plain ints are cheaper than NumPy scalars as dict keys in this loop
+    for i, page in enumerate(page_refs.tolist()):
+        if page in page_to_slot:
             if algorithm == "LRU":
-                recency.remove(page)
-                recency.append(page)
+                recency.move_to_end(page)
         else:
-            fault = True
-            page_faults += 1
-            if -1 in frames:
-                idx = frames.index(-1)
+            fault_markers[i] = True
+            if free_slots:
+                idx = free_slots.popleft()
             else:
                 if algorithm == "LRU":
                     # Replace the least recently used page
-                    lru_page = recency.popleft()
-                    idx = frames.index(lru_page)
+                    lru_page, _ = recency.popitem(last=False)
+                    idx = page_to_slot.pop(lru_page)
                 elif algorithm == "Optimal":
                     # Replace the page that is used farthest in the future
-                    future_uses = {}
-                    for p in frames:
-                        try:
-                            future_uses[p] = page_refs[i+1:].index(p)
-                        except ValueError:
-                            future_uses[p] = float('inf')
-                    idx = frames.index(max(future_uses, key=future_uses.get))
+                    next_uses = next_use[[last_ref[p] for p in frames]]
+                    idx = int(np.argmax(next_uses))
+                    del page_to_slot[frames[idx]]
             frames[idx] = page
+            page_to_slot[page] = idx
             if algorithm == "LRU":
-                if page in recency:
-                    recency.remove(page)
-                recency.append(page)
-        frame_history.append(frames.copy())
-        fault_markers.append(fault)
-    return page_faults, frame_history, fault_markers
+                recency[page] = None
+        if algorithm == "Optimal":
+            last_ref[page] = i
+        history[i] = frames
+    return int(fault_markers.sum()), history, fault_markers
+
+def _highlight_fault_rows(frame):
+    # Styles for the whole table at once: every cell of a fault row gets the highlight
+    is_fault = frame["Fault"].to_numpy()[:, None] == "Yes"
+    styles = np.where(np.broadcast_to(is_fault, frame.shape), 'background: #ffebee', '')
+    return pd.DataFrame(styles, index=frame.index, columns=frame.columns)
 
 def plot_frame_history_table(frame_history, page_refs, fault_markers):
-    num_frames = len(frame_history[0])
-    data = []
-    for i, state in enumerate(frame_history):
-        row = {"Reference": page_refs[i], "Fault": "Yes" if fault_markers[i] else ""}
-        for j in range(num_frames):
-            row[f"Frame {j+1}"] = state[j] if state[j] != -1 else ""
-        data.append(row)
-    df = pd.DataFrame(data)
+    num_frames = frame_history.shape[1]
+    # Build the table straight from the history matrix; empty frames show as blank
+    df = pd.DataFrame(np.where(frame_history == -1, "", frame_history.astype(object)),
+                      columns=[f"Frame {j+1}" for j in range(num_frames)])
+    df.insert(0, "Reference", page_refs)
+    df.insert(1, "Fault", np.where(fault_markers, "Yes", ""))
     # Style: highlight fault rows in a soft red background.
-    styled_df = df.style.apply(lambda x: ['background: #ffebee' if x.Fault=="Yes" else '' for _ in x], axis=1)\
+    styled_df = df.style.apply(_highlight_fault_rows, axis=None)\
                         .set_properties(**{'font-size': '14px', 'text-align': 'center'})
     st.dataframe(styled_df, height=300)
 
-def plot_frame_history_heatmap(frame_history):
-    # Create a matrix: rows represent page reference steps, columns are frame states.
-    matrix = np.array(frame_history)
+@st.cache_data(show_spinner=False)
+def _frame_history_matrix(frame_history):
+    # Rows represent page reference steps, columns are frame states.
     # Replace -1 with np.nan for better visualization (shows as blank)
-    matrix = np.where(matrix == -1, np.nan, matrix)
-    
+    return np.where(frame_history == -1, np.nan, frame_history)
+
+@lru_cache(maxsize=32)
+def _heatmap_cmap(num_colors):
+    cmap = ListedColormap(sns.color_palette("Set2", num_colors))
+    cmap.set_bad('white')  # Empty frames (NaN) show as blank cells
+    return cmap
+
+def plot_frame_history_heatmap(frame_history):
+    matrix = _frame_history_matrix(frame_history)
+    num_steps, num_frames = matrix.shape
+
     # Setup a color palette
-    num_colors = int(np.nanmax(matrix)) + 2 if np.nanmax(matrix)==np.nanmax(matrix) else 10
-    cmap = sns.color_palette("Set2", num_colors)
-    
-    fig, ax = plt.subplots(figsize=(12, len(frame_history)*0.5+2))
-    sns.heatmap(matrix, annot=True, fmt=".0f", cmap=cmap, cbar=False, linewidths=1,
-                linecolor='gray', ax=ax, square=True, annot_kws={"size": 12}, mask=np.isnan(matrix))
+    num_colors = 10 if np.isnan(matrix).all() else int(np.nanmax(matrix)) + 2
+    cmap = _heatmap_cmap(num_colors)
+
+    # A single imshow instead of sns.heatmap; long histories are drawn without
+    # per-cell annotations, which dominate the render time.
+    fig, ax = plt.subplots(figsize=(12, min(num_steps, HEATMAP_ANNOTATE_LIMIT)*0.5+2))
+    ax.imshow(np.ma.masked_invalid(matrix), cmap=cmap, aspect='auto', interpolation='nearest')
+    if num_steps <= HEATMAP_ANNOTATE_LIMIT:
+        for i, j in zip(*np.nonzero(~np.isnan(matrix))):
+            ax.text(j, i, f"{matrix[i, j]:.0f}", ha='center', va='center', fontsize=12)
+        ax.set_yticks(np.arange(num_steps))
+        ax.set_yticks(np.arange(num_steps + 1) - 0.5, minor=True)
+    ax.set_xticks(np.arange(num_frames))
+    ax.set_xticks(np.arange(num_frames + 1) - 0.5, minor=True)
+    ax.grid(which='minor', color='gray', linewidth=1)
+    ax.tick_params(which='minor', length=0)
     ax.set_xlabel("Frames", fontsize=12, fontweight='bold')
     ax.set_ylabel("Page Reference Step", fontsize=12, fontweight='bold')
     ax.set_title("Frame Status Over Time (Heatmap)", fontsize=14, fontweight='bold')
-    st.pyplot(fig)
+    st.pyplot(fig, clear_figure=True)
+    plt.close(fig)  # Release the figure so reruns do not accumulate open figures
 
 # ===========================
 # Memory Fragmentation Simulation
 # ===========================
+def _allocate_first_fit(free_gaps, block_size):
+    # free_gaps is a sorted list of (start, length); take the first gap that fits
+    for k, (start, length) in enumerate(free_gaps):
+        if length >= block_size:
+            if length == block_size:
+                del free_gaps[k]
+            else:
+                free_gaps[k] = (start + block_size, length - block_size)
+            return start
+    return None
+
+def _free_block(free_gaps, start, length):
+    # Insert the freed range and coalesce it with adjacent gaps
+    k = bisect_left(free_gaps, (start, length))
+    if k < len(free_gaps) and start + length == free_gaps[k][0]:
+        length += free_gaps.pop(k)[1]
+    if k > 0 and free_gaps[k - 1][0] + free_gaps[k - 1][1] == start:
+        start, prev_length = free_gaps.pop(k - 1)
+        length += prev_length
+        k -= 1
+    free_gaps.insert(k, (start, length))
+
+@st.cache_data(show_spinner=False)
 def simulate_memory_fragmentation(total_memory, block_size, num_allocs, num_deallocs):
-    memory = [None] * total_memory
+    # Seed from the inputs so identical runs give identical (and cacheable) results
+    rng = random.Random(hash((total_memory, block_size, num_allocs, num_deallocs)))
+    free_gaps = [(0, total_memory)]
     allocations = {}
     allocation_id = 1
     
     # Allocation phase: allocate contiguous blocks if available
+    max_gap = total_memory  # Largest free gap; lets us stop without scanning
     for _ in range(num_allocs):
-        start = None
-        for i in range(total_memory - block_size + 1):
-            if all(memory[j] is None for j in range(i, i + block_size)):
-                start = i
-                break
-        if start is None:
+        if max_gap < block_size:
             break  # No contiguous free space available
-        for j in range(start, start + block_size):
-            memory[j] = allocation_id
+        start = _allocate_first_fit(free_gaps, block_size)
         allocations[allocation_id] = (start, start + block_size - 1)
         allocation_id += 1
+        max_gap = max((length for _, length in free_gaps), default=0)
 
     # Deallocation phase: randomly free some allocations to simulate fragmentation
-    deallocated = set(random.sample(list(allocations.keys()), min(num_deallocs, len(allocations))))
+    # Allocation ids are the consecutive integers 1..allocation_id-1, so sample the range directly
+    deallocated = set(rng.sample(range(1, allocation_id), min(num_deallocs, allocation_id - 1)))
     for alloc in deallocated:
         start, end = allocations[alloc]
-        for j in range(start, end + 1):
-            memory[j] = None
+        _free_block(free_gaps, start, end - start + 1)
+
+    # Materialize the memory map for plotting in one pass (0 = free): sort the live
+    # blocks and free gaps by start address and expand each run with np.repeat
+    runs = sorted([(start, end - start + 1, alloc) for alloc, (start, end) in allocations.items()
+                   if alloc not in deallocated] + [(start, length, 0) for start, length in free_gaps])
+    memory = np.repeat(np.array([label for _, _, label in runs], dtype=np.int32),
+                       [length for _, length, _ in runs])
 
     return memory, allocations, deallocated
 
 def plot_memory_fragmentation(memory):
     fig, ax = plt.subplots(figsize=(12, 3))
-    colors = {}
     color_list = plt.cm.Paired.colors  # Using a paired colormap for clear distinction
-    color_idx = 0
 
-    for i, block in enumerate(memory):
-        if block is None:
-            color = 'white'
-            edgecolor = 'gray'
-        else:
-            if block not in colors:
-                colors[block] = color_list[color_idx % len(color_list)]
-                color_idx += 1
-            color = colors[block]
-            edgecolor = 'black'
-        ax.add_patch(plt.Rectangle((i, 0), 1, 1, facecolor=color, edgecolor=edgecolor, lw=1))
+    # Draw the whole map as one image: 0 is free (white), allocated blocks are numbered
+    # in address order and cycle through the paired colors.
+    allocated = memory > 0
+    _, block_rank = np.unique(memory[allocated], return_inverse=True)
+    color_idx = np.zeros(len(memory), dtype=int)
+    color_idx[allocated] = block_rank % len(color_list) + 1
+    cmap = ListedColormap(['white'] + list(color_list))
+    ax.imshow(color_idx[None, :], aspect='auto', cmap=cmap, vmin=0, vmax=len(color_list),
+              extent=(0, len(memory), 0, 1), interpolation='nearest')
+    # Cell outlines (black for allocated, gray for free) batched into a single collection
+    cells = [plt.Rectangle((i, 0), 1, 1) for i in range(len(memory))]
+    edgecolors = np.where(allocated[:, None], to_rgba_array('black'), to_rgba_array('gray'))
+    ax.add_collection(PatchCollection(cells, facecolors='none', edgecolors=edgecolors, linewidths=1))
     
     ax.set_xlim(0, len(memory))
     ax.set_ylim(0, 1)
@@ -185,7 +326,8 @@ def plot_memory_fragmentation(memory):
     ax.set_yticks([])
     ax.set_title("Memory Fragmentation Visualization", fontsize=14, fontweight='bold')
     ax.grid(True, which='both', color='lightgray', linestyle='--', linewidth=0.5)
-    st.pyplot(fig)
+    st.pyplot(fig, clear_figure=True)
+    plt.close(fig)
 
 # ===========================
 # App Layout and UI
@@ -206,7 +348,7 @@ if sim_type == "Page Replacement Simulation":
     
     if st.button("Run Page Replacement Simulation"):
         if page_refs:
-            faults, history, fault_markers = simulate_page_replacement(page_refs, num_frames, algorithm)
+            faults, history, fault_markers = simulate_page_replacement(tuple(page_refs), num_frames, algorithm)
             st.success(f"Simulation complete! Total page faults: {faults}")
             st.subheader("Step-by-Step Frame History")
             plot_frame_history_table(history, page_refs, fault_markers)